@@ -0,0 +1,180 @@
+import json
+import time
+import asyncio
+import numpy as np
+from trader import FEATURE_ORDER
+from evaluation_backend import get_backend
+from feature_store import FEATURE_NAMES, load_market_data, load_stacked_datasets, feature_matrix
+from metrics import DEFAULT_FITNESS, METRIC_NAMES, fitness_scores
+from walk_forward import aggregate_metrics
+from holdout import collect_traders, evaluate_holdout
+
+# Constants
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+def load_top_traders(config, top_k):
+    """
+    Load the best k traders of a simulation's checkpoint.
+    The saved wealth belongs to the parents of the mutated clones in the
+    checkpoint, so every trader is re-scored on the configured datasets and
+    date range first and ranked with the simulation's fitness.
+    """
+    entries = collect_traders(config.save_dir)
+    dataset, segments = load_stacked_datasets(getattr(config, 'dataset_paths', [config.dataset_path]),
+                                              config.start_date, config.end_date)
+    leaderboard = evaluate_holdout(entries, dataset, segments, get_backend(getattr(config, 'backend', 'auto')),
+                                   getattr(config, 'features', FEATURE_ORDER))
+    # Select with the training fitness, aggregated over assets as in training;
+    # one checkpoint, so trader index == position in entries
+    fitness = getattr(config, 'fitness', DEFAULT_FITNESS)
+    metrics = {
+        name: leaderboard.pivot(index='trader', columns='asset', values=name).loc[range(len(entries))].to_numpy()
+        for name in METRIC_NAMES
+    }
+    metrics = aggregate_metrics(metrics, fitness, getattr(config, 'walk_forward_aggregate', 'mean'))
+    scores = fitness_scores(metrics, fitness)
+    traders = [entries[i][2] for i in np.argsort(-scores, kind='stable')[:top_k]]
+    return traders, entries[0][0]
+
+
+class DecisionService:
+    """
+    Answers trading decisions for a fixed set of traders.
+    Concurrent requests are queued and coalesced into one batched
+    forward pass per trader (up to max_batch requests, waiting at most
+    max_delay seconds for the batch to fill).
+    """
+    def __init__(self, traders, max_batch=64, max_delay=0.002, feature_order=FEATURE_ORDER):
+        self.traders = traders
+        self.feature_order = feature_order
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue = None
+        self.batches_served = 0
+        self.requests_served = 0
+
+    async def decide(self, market_features, ensemble=False):
+        """Queue one feature dict and wait for its batched result"""
+        inputs = np.array([market_features[k] for k in self.feature_order], dtype=np.float32)
+        if inputs.shape != (len(self.feature_order),):
+            raise ValueError("every feature must be a single number")
+        if not np.isfinite(inputs).all():
+            raise ValueError("every feature must be a finite number")
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((inputs, future))
+        actions = await future
+        if not np.isfinite(actions).all():
+            raise ArithmeticError("traders returned a non-finite action")
+        if ensemble:
+            return {'ensemble': float(np.mean(actions))}
+        return {'actions': [float(a) for a in actions]}
+
+    async def batch_worker(self):
+        """Collect queued requests into batches and run them together"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                inputs = np.stack([item[0] for item in batch])
+                actions = np.array([t.network.predict_batch(inputs) for t in self.traders])  # (traders x batch)
+                for i, (_, future) in enumerate(batch):
+                    if not future.done():
+                        future.set_result(actions[:, i])
+            except Exception as e:
+                # A failed batch must not kill the worker, fail its requests instead
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches_served += 1
+            self.requests_served += len(batch)
+
+    async def handle_client(self, reader, writer):
+        """One JSON request per line: {"features": {...}, "ensemble": bool}"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    response = await self.decide(request['features'], request.get('ensemble', False))
+                except (ValueError, KeyError, TypeError) as e:
+                    response = {'error': f"Bad request: {str(e)}"}
+                except Exception as e:
+                    response = {'error': f"Decision failed: {str(e)}"}
+                writer.write((json.dumps(response, allow_nan=False) + "\n").encode())
+                await writer.drain()
+        except ConnectionResetError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Run the socket server until cancelled"""
+        self.queue = asyncio.Queue()
+        worker = asyncio.create_task(self.batch_worker())
+        server = await asyncio.start_server(self.handle_client, host, port)
+        print(f"Serving {len(self.traders)} traders on {host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            worker.cancel()
+            if self.batches_served:
+                print(f"Served {self.requests_served} requests in {self.batches_served} batches "
+                      f"(avg batch {self.requests_served / self.batches_served:.1f})")
+
+
+async def _load_client(host, port, samples, num_requests, ensemble, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    for i in range(num_requests):
+        request = {'features': samples[i % len(samples)], 'ensemble': ensemble}
+        start = time.perf_counter()
+        writer.write((json.dumps(request) + "\n").encode())
+        await writer.drain()
+        await reader.readline()
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run_load_test(host=DEFAULT_HOST, port=DEFAULT_PORT, clients=32, requests_per_client=200,
+                        dataset_path=None, ensemble=False):
+    """Hammer a running decision service and report throughput and latency"""
+    # Samples carry every known feature so any served feature selection can read them
+    if dataset_path:
+        dataset = load_market_data(dataset_path)
+        samples = [dict(zip(FEATURE_NAMES, map(float, row)))
+                   for row in feature_matrix(dataset, FEATURE_NAMES)]
+    else:
+        samples = [dict(zip(FEATURE_NAMES, np.random.uniform(-1, 1, len(FEATURE_NAMES)).tolist()))
+                   for _ in range(256)]
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        _load_client(host, port, samples, requests_per_client, ensemble, latencies)
+        for _ in range(clients)
+    ])
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    print(f"Requests: {len(latencies)} from {clients} clients in {elapsed:.2f}s")
+    print(f"Throughput: {len(latencies) / elapsed:.0f} req/s")
+    print(f"Latency p50: {np.percentile(latencies_ms, 50):.2f}ms "
+          f"p95: {np.percentile(latencies_ms, 95):.2f}ms "
+          f"p99: {np.percentile(latencies_ms, 99):.2f}ms")
@@ -0,0 +1,204 @@
+import numpy as np
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    numba = None
+    NUMBA_AVAILABLE = False
+
+# Constants
+INITIAL_FIAT = 1000.0
+BACKEND_CHOICES = ['auto', 'numpy', 'numba']
+ACTIVATION_CODES = {'relu': 0, 'tanh': 1}  # Anything else is linear (2)
+TIME_TILE = 64  # Days per forward-pass tile in the fused kernel
+
+
+class EvaluationBackend:
+    """
+    Simulates a whole population over a feature matrix in one call.
+    simulate() returns (actions, fiat, btc, equity, notional):
+    - actions: (P x T) clipped network outputs, one row per trader
+    - fiat/btc: (P,) wallet balances after the final sell-all
+    - equity: (P x T) float32 wealth after each day, or None unless record_equity
+    - notional: (P x T) float32 fiat value bought or sold each day, or None unless record_equity
+    With wallets=False only actions are computed and the other outputs are None.
+    """
+    name = None
+
+    def simulate(self, networks, features, prices, record_equity=False, wallets=True):
+        raise NotImplementedError
+
+    def __str__(self):
+        return f"EvaluationBackend({self.name})"
+
+
+class NumpyBackend(EvaluationBackend):
+    """Reference backend: batched forward pass per network, wallets vectorized across traders"""
+    name = 'numpy'
+
+    def simulate(self, networks, features, prices, record_equity=False, wallets=True):
+        actions = np.empty((len(networks), len(prices)))
+        for i, network in enumerate(networks):
+            actions[i] = network.predict_batch(features)
+        np.clip(actions, -1.0, 1.0, out=actions)
+        if not wallets:
+            return actions, None, None, None, None
+
+        fiat = np.full(len(networks), INITIAL_FIAT)
+        btc = np.zeros(len(networks))
+        equity = np.empty((len(networks), len(prices)), dtype=np.float32) if record_equity else None
+        notional = np.empty((len(networks), len(prices)), dtype=np.float32) if record_equity else None
+        for t, price in enumerate(prices):
+            action = actions[:, t]
+            # Buy BTC (zero-sized for non-buyers, so their balances stay exact)
+            btc_to_buy = np.where(action > 0, (fiat / price) * action, 0.0)
+            fiat -= btc_to_buy * price
+            btc += btc_to_buy
+            # Sell BTC
+            btc_to_sell = np.where(action < 0, btc * -action, 0.0)
+            fiat += btc_to_sell * price
+            btc -= btc_to_sell
+            if record_equity:
+                equity[:, t] = fiat + btc * price
+                notional[:, t] = (btc_to_buy + btc_to_sell) * price
+
+        # Finalize by selling all BTC
+        fiat += btc * prices[-1]
+        btc -= btc
+        return actions, fiat, btc, equity, notional
+
+
+if NUMBA_AVAILABLE:
+    @numba.njit(parallel=True, cache=True)
+    def _fused_kernel(features, prices, weights, weight_offsets, layer_in, layer_out,
+                      layer_act, network_offsets, max_width, actions, fiat_out, btc_out,
+                      wallets, record_equity, equity, notional):
+        num_days = features.shape[0]
+        num_features = features.shape[1]
+        for p in numba.prange(network_offsets.shape[0] - 1):
+            buffers = np.empty((2, max_width, TIME_TILE))  # Ping-pong layer activations
+            fiat = INITIAL_FIAT
+            btc = 0.0
+            for tile_start in range(0, num_days, TIME_TILE):
+                n = min(TIME_TILE, num_days - tile_start)
+
+                # Forward pass of this trader's layer stack over one tile of days
+                src = 0
+                for k in range(num_features):
+                    for r in range(n):
+                        buffers[src, k, r] = features[tile_start + r, k]
+                for layer in range(network_offsets[p], network_offsets[p + 1]):
+                    n_in = layer_in[layer]
+                    n_out = layer_out[layer]
+                    offset = weight_offsets[layer]
+                    dst = 1 - src
+                    for j in range(n_out):
+                        for r in range(n):
+                            buffers[dst, j, r] = 0.0
+                        for i in range(n_in):
+                            w = weights[offset + i * n_out + j]
+                            for r in range(n):
+                                buffers[dst, j, r] += buffers[src, i, r] * w
+                        if layer_act[layer] == 0:
+                            for r in range(n):
+                                buffers[dst, j, r] = max(0.0, buffers[dst, j, r])
+                        elif layer_act[layer] == 1:
+                            for r in range(n):
+                                buffers[dst, j, r] = np.tanh(buffers[dst, j, r])
+                    src = dst
+
+                # Wallet update, same arithmetic as Trader.execute_trade
+                for r in range(n):
+                    t = tile_start + r
+                    action = min(max(buffers[src, 0, r], -1.0), 1.0)
+                    actions[p, t] = action
+                    if not wallets:
+                        continue
+                    price = prices[t]
+                    traded = 0.0
+                    if action > 0:
+                        btc_to_buy = (fiat / price) * action
+                        fiat -= btc_to_buy * price
+                        btc += btc_to_buy
+                        traded = btc_to_buy
+                    elif action < 0:
+                        btc_to_sell = btc * -action
+                        fiat += btc_to_sell * price
+                        btc -= btc_to_sell
+                        traded = btc_to_sell
+                    if record_equity:
+                        equity[p, t] = fiat + btc * price
+                        notional[p, t] = traded * price
+
+            fiat += btc * prices[num_days - 1]
+            fiat_out[p] = fiat
+            btc_out[p] = btc - btc
+
+
+class NumbaBackend(EvaluationBackend):
+    """
+    Compiled backend: fuses forward pass and wallet update, parallel across traders.
+    Each trader's network runs over tiles of TIME_TILE days that stay in cache,
+    so the inner loops are independent across days and vectorize.
+    """
+    name = 'numba'
+
+    def simulate(self, networks, features, prices, record_equity=False, wallets=True):
+        packed = self._pack_networks(networks, features.shape[1])
+        actions = np.empty((len(networks), len(prices)))
+        fiat = np.empty(len(networks))
+        btc = np.empty(len(networks))
+        record_equity = record_equity and wallets
+        shape = (len(networks), len(prices)) if record_equity else (0, 0)
+        equity = np.empty(shape, dtype=np.float32)
+        notional = np.empty(shape, dtype=np.float32)
+        _fused_kernel(np.ascontiguousarray(features, dtype=np.float32),
+                      np.ascontiguousarray(prices, dtype=np.float64),
+                      *packed, actions, fiat, btc, wallets, record_equity, equity, notional)
+        if not wallets:
+            return actions, None, None, None, None
+        if not record_equity:
+            return actions, fiat, btc, None, None
+        return actions, fiat, btc, equity, notional
+
+    @staticmethod
+    def _pack_networks(networks, num_features):
+        """Flatten every layer of every network into contiguous arrays for the kernel"""
+        weights = []
+        weight_offsets, layer_in, layer_out, layer_act = [], [], [], []
+        network_offsets = [0]
+        max_width = num_features
+        offset = 0
+        for network in networks:
+            for layer in network.layers:
+                n_in, n_out = layer.weights.shape
+                weights.append(np.ravel(layer.weights))
+                weight_offsets.append(offset)
+                layer_in.append(n_in)
+                layer_out.append(n_out)
+                layer_act.append(ACTIVATION_CODES.get(layer.activation, 2))
+                max_width = max(max_width, n_out)
+                offset += n_in * n_out
+            network_offsets.append(len(layer_in))
+
+        return (np.concatenate(weights).astype(np.float64),
+                np.array(weight_offsets, dtype=np.int64),
+                np.array(layer_in, dtype=np.int64),
+                np.array(layer_out, dtype=np.int64),
+                np.array(layer_act, dtype=np.int64),
+                np.array(network_offsets, dtype=np.int64),
+                max_width)
+
+
+def get_backend(name='auto'):
+    """Resolve a backend name, falling back to NumPy when Numba is missing"""
+    if name not in BACKEND_CHOICES:
+        raise ValueError(f"Unknown evaluation backend: {name}")
+    if name == 'numpy':
+        return NumpyBackend()
+    if NUMBA_AVAILABLE:
+        return NumbaBackend()
+    if name == 'numba':
+        print("Numba is not installed, falling back to the NumPy backend")
+    return NumpyBackend()
@@ -0,0 +1,185 @@
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+from trader import FEATURE_ORDER
+
+# Constants
+FEATURE_CACHE_DIR = "feature_cache"
+DATE_FORMAT = "%d %b, %Y"  # Date column of the normalized datasets, e.g. "1 Feb, 2018"
+INDICATOR_VERSION = 1  # Bump when indicator formulas change to invalidate caches
+INDICATOR_PARAMS = {
+    'return_horizons': [1, 7],
+    'sma_windows': [7, 30],
+    'volatility_windows': [7, 30],
+    'rsi_period': 14,
+    'macd_spans': [12, 26, 9],
+}
+BASE_COLUMNS = {
+    'sin_month': 'sin_month', 'cos_month': 'cos_month',
+    'sin_doy': 'sin_doy', 'cos_doy': 'cos_doy',
+    'sin_dow': 'sin_dow', 'cos_dow': 'cos_dow',
+    'year_scaled': 'Year_Scaled', 'fear_greed': 'FearGreed_Scaled'
+}  # Network feature name -> normalized dataset column
+
+
+def indicator_names(params=INDICATOR_PARAMS):
+    """Names of the price-derived features, in cache column order"""
+    names = [f"return_{h}d" for h in params['return_horizons']]
+    names += [f"sma_ratio_{w}" for w in params['sma_windows']]
+    names += [f"volatility_{w}" for w in params['volatility_windows']]
+    names += [f"rsi_{params['rsi_period']}", 'macd', 'macd_signal', 'macd_hist']
+    return names
+
+
+FEATURE_NAMES = list(FEATURE_ORDER) + indicator_names()
+
+
+def rolling_mean(x, window):
+    """O(T) trailing mean via cumulative sums (shorter windows at the start)"""
+    csum = np.concatenate([[0.0], np.cumsum(x)])
+    ends = np.arange(1, len(x) + 1)
+    starts = np.maximum(ends - window, 0)
+    return (csum[ends] - csum[starts]) / (ends - starts)
+
+
+def rolling_std(x, window):
+    """O(T) trailing standard deviation from running sums of x and x^2"""
+    mean = rolling_mean(x, window)
+    variance = rolling_mean(x * x, window) - mean * mean
+    return np.sqrt(np.maximum(variance, 0.0))
+
+
+def ema(x, span=None, alpha=None):
+    """Exponential moving average (recursive form, O(T))"""
+    return pd.Series(x).ewm(span=span, alpha=alpha, adjust=False).mean().to_numpy()
+
+
+def compute_indicators(prices, params=INDICATOR_PARAMS):
+    """
+    Price-derived indicators, one column per indicator_names() entry
+    Scaled to stay roughly within [-1, 1] like the calendar features
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    daily = np.zeros_like(prices)
+    daily[1:] = prices[1:] / prices[:-1] - 1.0
+
+    columns = []
+    for horizon in params['return_horizons']:
+        returns = np.zeros_like(prices)
+        returns[horizon:] = prices[horizon:] / prices[:-horizon] - 1.0
+        columns.append(returns)
+    for window in params['sma_windows']:
+        columns.append(prices / rolling_mean(prices, window) - 1.0)
+    for window in params['volatility_windows']:
+        columns.append(rolling_std(daily, window))
+
+    # Wilder RSI, shifted from [0, 100] to [-1, 1]
+    change = np.diff(prices, prepend=prices[0])
+    avg_gain = ema(np.maximum(change, 0.0), alpha=1.0 / params['rsi_period'])
+    avg_loss = ema(np.maximum(-change, 0.0), alpha=1.0 / params['rsi_period'])
+    total = avg_gain + avg_loss
+    rsi = np.divide(avg_gain, total, out=np.full_like(total, 0.5), where=total > 0)
+    columns.append(rsi * 2.0 - 1.0)
+
+    # MACD relative to price
+    fast, slow, signal = params['macd_spans']
+    macd = (ema(prices, span=fast) - ema(prices, span=slow)) / prices
+    macd_signal = ema(macd, span=signal)
+    columns += [macd, macd_signal, macd - macd_signal]
+
+    return np.stack(columns, axis=1)
+
+
+def _cache_key(dataset_path, params):
+    digest = hashlib.sha256()
+    with open(dataset_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    digest.update(json.dumps({'params': params, 'version': INDICATOR_VERSION}, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+def load_indicators(dataset_path, prices, params=INDICATOR_PARAMS):
+    """Indicator matrix for a dataset, computed once and cached as .npy beside it"""
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(dataset_path)), FEATURE_CACHE_DIR)
+    cache_path = os.path.join(cache_dir, f"{_cache_key(dataset_path, params)}.npy")
+    if os.path.exists(cache_path):
+        try:
+            indicators = np.load(cache_path)
+        except (OSError, ValueError, EOFError):
+            indicators = None  # Truncated or corrupt cache file, recompute it
+        if indicators is not None and indicators.shape == (len(prices), len(indicator_names(params))):
+            return indicators
+
+    indicators = compute_indicators(prices, params)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Write to a temporary file and rename it into place, so a concurrent or
+    # interrupted run never leaves a partial cache file behind
+    fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, indicators)
+        os.replace(temp_path, cache_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return indicators
+
+
+def load_market_data(dataset_path):
+    """Load a normalized dataset sorted by date with every indicator attached"""
+    dataset = pd.read_csv(dataset_path)
+    dataset['Date'] = pd.to_datetime(dataset['Date'], format=DATE_FORMAT)
+    dataset = dataset.sort_values('Date', kind='stable').reset_index(drop=True)
+    indicators = load_indicators(dataset_path, dataset['Price_Float'].to_numpy(dtype=np.float64))
+    for i, name in enumerate(indicator_names()):
+        dataset[name] = indicators[:, i]
+    return dataset
+
+
+def load_stacked_datasets(dataset_paths, start_date=None, end_date=None):
+    """
+    Load every dataset restricted to [start_date, end_date] and stack them into
+    one timeline with an Asset column (the file name without extension)
+    Returns: (dataset, segments) with segments the (A x 2) [start, end) day
+    ranges of each asset
+    """
+    assets = []
+    for path in dataset_paths:
+        asset = load_market_data(path)
+        if start_date:
+            asset = asset[asset['Date'] >= pd.to_datetime(start_date)]
+        if end_date:
+            asset = asset[asset['Date'] <= pd.to_datetime(end_date)]
+        if asset.empty:
+            raise ValueError(f"No trading days in {path} for the requested date range")
+        asset['Asset'] = os.path.splitext(os.path.basename(path))[0]
+        assets.append(asset)
+    names = [asset['Asset'].iloc[0] for asset in assets]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Datasets must have distinct file names: {', '.join(names)}")
+
+    dataset = pd.concat(assets, ignore_index=True)
+    lengths = np.array([len(asset) for asset in assets])
+    segments = np.stack([np.cumsum(lengths) - lengths, np.cumsum(lengths)], axis=1)
+    return dataset, segments
+
+
+def feature_matrix(dataset, feature_names):
+    """Network input matrix (T x len(feature_names)) for a loaded dataset"""
+    columns = [BASE_COLUMNS.get(name, name) for name in feature_names]
+    return dataset[columns].to_numpy(dtype=np.float32)
+
+
+def validate_feature_names(feature_names):
+    """Reject unknown or duplicate feature names"""
+    unknown = [name for name in feature_names if name not in FEATURE_NAMES]
+    if unknown:
+        raise ValueError(f"Unknown features: {', '.join(unknown)} (choose from {', '.join(FEATURE_NAMES)})")
+    if len(set(feature_names)) != len(feature_names):
+        raise ValueError("Features must not repeat")
+    return list(feature_names)
@@ -0,0 +1,103 @@
+import os
+import re
+import glob
+import pickle
+import numpy as np
+import pandas as pd
+from trader import Trader, FEATURE_ORDER
+from evaluation_backend import get_backend, INITIAL_FIAT
+from simulation_engine import GENERATION_FILE
+from feature_store import load_stacked_datasets, feature_matrix
+from metrics import trade_counts
+from walk_forward import simulate_windows, window_metrics
+
+ARCHIVE_PATTERN = re.compile(r"generation_(\d+)\.pkl$")
+
+
+def collect_traders(save_dir, first_gen=None, last_gen=None):
+    """
+    Gather traders to evaluate as (generation, index, trader) tuples.
+    Without a generation range only the latest checkpoint is used,
+    otherwise every archived snapshot inside the range.
+    """
+    if first_gen is None and last_gen is None:
+        paths = [os.path.join(save_dir, GENERATION_FILE)]
+    else:
+        first_gen = first_gen if first_gen is not None else 0
+        last_gen = last_gen if last_gen is not None else float('inf')
+        paths = sorted(
+            path for path in glob.glob(os.path.join(save_dir, "generation_*.pkl"))
+            if ARCHIVE_PATTERN.search(path)
+            and first_gen <= int(ARCHIVE_PATTERN.search(path).group(1)) <= last_gen
+        )
+
+    entries = []
+    for path in paths:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Missing generation file: {path}")
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        for index, serialized in enumerate(data['traders']):
+            entries.append((data['generation'], index, Trader.deserialize(serialized)))
+
+    if not entries:
+        raise ValueError(f"No saved generations found in {save_dir} for the requested range")
+    return entries
+
+
+def evaluate_holdout(entries, dataset, segments, backend, feature_names=FEATURE_ORDER):
+    """
+    Simulate every collected trader on every asset and rank them per asset.
+    Networks run once over the stacked timeline and each asset gets its own
+    wallets from the shared actions.
+    """
+    features = feature_matrix(dataset, feature_names)
+    prices = dataset['Price_Float'].to_numpy(dtype=np.float64)
+    networks = [trader.network for _, _, trader in entries]
+    actions = backend.simulate(networks, features, prices, wallets=False)[0]
+    fiat, equity, notional = simulate_windows(actions, prices, segments, record_equity=True)
+    metrics = window_metrics(fiat, equity, notional, segments)
+
+    boards = []
+    for k, (start, end) in enumerate(segments):
+        board = pd.DataFrame({
+            'asset': dataset['Asset'].iloc[start],
+            'generation': [generation for generation, _, _ in entries],
+            'trader': [index for _, index, _ in entries],
+            'wealth': fiat[:, k],
+            'return_pct': (fiat[:, k] / INITIAL_FIAT - 1) * 100,
+            'trades': trade_counts(notional[:, k, :end - start]),
+            'max_drawdown': metrics['max_drawdown'][:, k],
+            'volatility': metrics['volatility'][:, k],
+            'sharpe': metrics['sharpe'][:, k],
+            'sortino': metrics['sortino'][:, k],
+            'turnover': metrics['turnover'][:, k],
+            'in_sample_wealth': [trader.total_wealth for _, _, trader in entries],
+        })
+        board = board.sort_values('wealth', ascending=False, kind='stable').reset_index(drop=True)
+        board.insert(0, 'rank', np.arange(1, len(board) + 1))  # Rank within the asset
+        boards.append(board)
+    return pd.concat(boards, ignore_index=True)
+
+
+def run_holdout(config, args):
+    """Evaluate saved traders on a holdout range and write the leaderboard CSV"""
+    backend = get_backend(args.backend or getattr(config, 'backend', 'auto'))
+    dataset_paths = args.dataset or getattr(config, 'dataset_paths', [config.dataset_path])
+    dataset, segments = load_stacked_datasets(dataset_paths, args.start_date, args.end_date)
+    entries = collect_traders(config.save_dir, args.first_gen, args.last_gen)
+    first_day, last_day = dataset['Date'].min(), dataset['Date'].max()
+    print(f"Evaluating {len(entries)} traders on {len(dataset)} trading days "
+          f"({first_day:%Y-%m-%d} to {last_day:%Y-%m-%d})"
+          + (f" from {len(dataset_paths)} assets" if len(dataset_paths) > 1 else ""))
+
+    leaderboard = evaluate_holdout(entries, dataset, segments, backend, getattr(config, 'features', FEATURE_ORDER))
+
+    output = args.output or os.path.join(
+        config.save_dir,
+        f"holdout_{first_day:%Y%m%d}_{last_day:%Y%m%d}.csv"
+    )
+    leaderboard.to_csv(output, index=False)
+    print(leaderboard.groupby('asset', sort=False).head(10).to_string(index=False))
+    print(f"Leaderboard saved to: {output}")
+    return leaderboard
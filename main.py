@@ -1,6 +1,10 @@
 import sys
+import asyncio
 from utils import Utilities
 from simulation_engine import TradingEnvironment
+from decision_service import DecisionService, load_top_traders, run_load_test
+from holdout import run_holdout
+from trader import FEATURE_ORDER
 
 def main():
     # Parse command line arguments
@@ -13,6 +17,37 @@ def main():
         config = Utilities.handle_new_simulation(args)
     elif args.command in ('load', '-l'):
         config = Utilities.handle_load_simulation(args.save_dir)
+        if args.backend:
+            config.backend = args.backend
+        if args.fitness:
+            config.fitness = args.fitness
+    elif args.command == 'holdout':
+        config = Utilities.handle_load_simulation(args.save_dir)
+        try:
+            run_holdout(config, args)
+        except Exception as e:
+            print(f"Error running holdout evaluation: {str(e)}")
+            sys.exit(1)
+        return
+    elif args.command == 'serve':
+        config = Utilities.handle_load_simulation(args.save_dir)
+        try:
+            traders, generation = load_top_traders(config, args.top_k)
+        except Exception as e:
+            print(f"Error loading traders: {str(e)}")
+            sys.exit(1)
+        print(f"Loaded top {len(traders)} traders from generation {generation}")
+        service = DecisionService(traders, args.max_batch, args.max_delay_ms / 1000,
+                                  getattr(config, 'features', FEATURE_ORDER))
+        try:
+            asyncio.run(service.serve(args.host, args.port))
+        except KeyboardInterrupt:
+            print("\nDecision service stopped.")
+        return
+    elif args.command == 'loadgen':
+        asyncio.run(run_load_test(args.host, args.port, args.clients, args.requests,
+                                  args.dataset, args.ensemble))
+        return
     
 
     test_phase = False
@@ -22,7 +57,11 @@ def main():
 
     # Initialize and run environment
     if config:
-        env = TradingEnvironment(config, test_phase)
+        try:
+            env = TradingEnvironment(config, test_phase)
+        except ValueError as e:
+            print(f"Error loading simulation: {str(e)}")
+            sys.exit(1)
         env.run()
         
 if __name__ == "__main__":
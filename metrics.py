@@ -0,0 +1,97 @@
+import numpy as np
+from evaluation_backend import INITIAL_FIAT
+
+# Constants
+TRADING_DAYS_PER_YEAR = 365  # Crypto trades every day
+METRIC_NAMES = ['wealth', 'max_drawdown', 'volatility', 'sharpe', 'sortino', 'turnover']
+DEFAULT_FITNESS = {'wealth': 1.0}
+MIN_TRADE_NOTIONAL = 0.01  # Fiat moved below this (e.g. selling with no BTC held) is not a trade
+
+
+def daily_returns(equity):
+    """
+    Day-over-day returns of every equity curve, starting from the initial fiat
+    equity: (P x T) wealth after each day
+    Returns: (P x T) float64 returns
+    """
+    previous = np.empty(equity.shape, dtype=np.float64)
+    previous[:, 0] = INITIAL_FIAT
+    previous[:, 1:] = equity[:, :-1]
+    return equity / previous - 1.0
+
+
+def max_drawdown(equity):
+    """
+    Largest peak-to-trough loss of every equity curve
+    equity: (P x T) wealth after each day
+    Returns: (P,) fractions between 0 and 1
+    """
+    peaks = np.maximum(np.maximum.accumulate(equity, axis=1), INITIAL_FIAT)
+    return np.max((peaks - equity) / peaks, axis=1)
+
+
+def volatility(returns):
+    """Annualized standard deviation of daily returns"""
+    return np.std(returns, axis=1) * np.sqrt(TRADING_DAYS_PER_YEAR)
+
+
+def sharpe_ratio(returns):
+    """Annualized mean return over volatility (0 for traders that never move)"""
+    std = np.std(returns, axis=1)
+    mean = np.mean(returns, axis=1)
+    ratio = np.divide(mean, std, out=np.zeros_like(mean), where=std > 0)
+    return ratio * np.sqrt(TRADING_DAYS_PER_YEAR)
+
+
+def sortino_ratio(returns):
+    """Annualized mean return over downside deviation (0 without losing days)"""
+    downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2, axis=1))
+    mean = np.mean(returns, axis=1)
+    ratio = np.divide(mean, downside, out=np.zeros_like(mean), where=downside > 0)
+    return ratio * np.sqrt(TRADING_DAYS_PER_YEAR)
+
+
+def turnover(notional, equity):
+    """Mean daily traded notional as a fraction of wealth"""
+    return np.mean(notional / np.asarray(equity, dtype=np.float64), axis=1)
+
+
+def trade_counts(notional):
+    """Number of days each trader actually moved money (notional from the backend)"""
+    return np.count_nonzero(notional > MIN_TRADE_NOTIONAL, axis=1)
+
+
+def compute_risk_metrics(wealth, notional, equity):
+    """
+    All metrics of METRIC_NAMES for a population in vectorized passes
+    wealth: (P,) final wealth, notional/equity: (P x T) backend outputs
+    Returns: dict of metric name -> (P,) array
+    """
+    returns = daily_returns(equity)
+    return {
+        'wealth': np.asarray(wealth, dtype=np.float64),
+        'max_drawdown': max_drawdown(equity),
+        'volatility': volatility(returns),
+        'sharpe': sharpe_ratio(returns),
+        'sortino': sortino_ratio(returns),
+        'turnover': turnover(notional, equity),
+    }
+
+
+def needs_equity(fitness):
+    """Whether a fitness combination uses anything beyond final wealth"""
+    return any(name != 'wealth' for name in fitness)
+
+
+def fitness_scores(metrics, fitness):
+    """
+    Weighted sum of z-scored metrics, higher is better
+    fitness: dict of metric name -> weight (negative weights penalize)
+    """
+    scores = np.zeros(len(metrics['wealth']))
+    for name, weight in fitness.items():
+        values = metrics[name]
+        std = np.std(values)
+        if std > 0:
+            scores += weight * (values - np.mean(values)) / std
+    return scores
@@ -48,6 +48,15 @@ class NeuralNetwork:
         for layer in self.layers:
             x = layer.forward(x)
         return x.item()  # Return scalar value
+
+    def predict_batch(self, X):
+        """
+        Process a whole feature matrix (T x inputs) in one pass
+        Returns: array of T floats between -1 and 1
+        """
+        for layer in self.layers:
+            X = layer.forward(X)
+        return X[:, 0]
     
     def mutate(self, mutation_rate=0.1, mutation_scale=0.2):
         """
@@ -1,9 +1,13 @@
 import os
 import pickle
 import numpy as np
-import pandas as pd
 from datetime import datetime
 from trader import Trader
+from evaluation_backend import get_backend, INITIAL_FIAT
+from metrics import DEFAULT_FITNESS, compute_risk_metrics, fitness_scores, needs_equity
+from walk_forward import make_windows, simulate_windows, walk_forward_fitness, window_fitness
+from feature_store import load_stacked_datasets, feature_matrix
+from trader import FEATURE_ORDER
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 import matplotlib.dates as mdates
@@ -11,11 +15,22 @@ import matplotlib.dates as mdates
 
 # Constants
 GENERATION_FILE = "generation.pkl"
+GENERATION_ARCHIVE_FILE = "generation_{:05d}.pkl"  # Per-generation snapshots (keep_generations)
 
 class TradingEnvironment:
     def __init__(self, config, test_mode=False):
         self.config = config
         self.dataset = None
+        self.features = None
+        self.prices = None
+        self.backend = get_backend(getattr(config, 'backend', 'auto'))
+        self.fitness_weights = getattr(config, 'fitness', DEFAULT_FITNESS)
+        self.feature_names = getattr(config, 'features', FEATURE_ORDER)
+        self.equity = None  # (P x T) float32, only kept when fitness needs risk metrics
+        self.metrics = None
+        self.fitness = None
+        self.windows = None  # (K x 2) walk-forward day ranges, None scores the full range (or each asset)
+        self.segments = None  # (A x 2) day ranges of each asset in the stacked timeline
         self.current_generation = 0
         self.population = []
         self.best_trader_history = []
@@ -87,25 +102,46 @@ class TradingEnvironment:
                 data = pickle.load(f)
                 self.population = [Trader.deserialize(t) for t in data['traders']]
                 self.current_generation = data['generation']
+
+            input_size = self.population[0].network.get_architecture()[0]
+            if input_size != len(self.feature_names):
+                raise ValueError(f"Saved networks take {input_size} inputs but "
+                                 f"{len(self.feature_names)} features are configured")
         else:
             print("Creating initial generation...")
-            self.population = [Trader() for _ in range(self.config.population)]
+            self.population = [
+                Trader(input_size=len(self.feature_names)) for _ in range(self.config.population)
+            ]
             self.save_generation()
 
     def load_dataset(self):
-        """Load and filter dataset"""
+        """Load and filter dataset(s), stacking several assets into one timeline"""
         try:
-            self.dataset = pd.read_csv(self.config.dataset_path, parse_dates=['Date'])
-            start_date = pd.to_datetime(self.config.start_date)
-            end_date = pd.to_datetime(self.config.end_date)
+            dataset_paths = getattr(self.config, 'dataset_paths', [self.config.dataset_path])
+            if self.test_mode:
+                self.dataset, self.segments = load_stacked_datasets(dataset_paths)
+            else:
+                self.dataset, self.segments = load_stacked_datasets(
+                    dataset_paths, self.config.start_date, self.config.end_date
+                )
             
-            if not self.test_mode:
-                self.dataset = self.dataset[
-                    (self.dataset['Date'] >= start_date) & 
-                    (self.dataset['Date'] <= end_date)
-                ].sort_values('Date').reset_index(drop=True)
+            # Feature matrix and prices are built once and reused by every generation
+            self.features = feature_matrix(self.dataset, self.feature_names)
+            self.prices = self.dataset['Price_Float'].to_numpy(dtype=np.float64)
             
-            print(f"Loaded {len(self.dataset)} trading days")
+            print(f"Loaded {len(self.dataset)} trading days"
+                  + (f" from {len(self.segments)} assets" if len(self.segments) > 1 else ""))
+
+            aggregate = getattr(self.config, 'walk_forward_aggregate', 'mean')
+            window = getattr(self.config, 'walk_forward_window', None)
+            if window and not self.test_mode:
+                step = getattr(self.config, 'walk_forward_step', None)
+                self.windows = np.concatenate([
+                    make_windows(end - start, window, step) + start for start, end in self.segments
+                ])
+                print(f"Walk-forward: {len(self.windows)} windows of {window} days ({aggregate} fitness)")
+            elif len(self.segments) > 1 and not self.test_mode:
+                print(f"Multi-asset: {len(self.segments)} assets ({aggregate} fitness)")
             return True
         except Exception as e:
             print(f"Dataset error: {str(e)}")
@@ -113,65 +149,74 @@ class TradingEnvironment:
 
     def run_generation(self):
         """Simulate one complete generation"""
-        # Reset trader states
-        for trader in self.population:
-            trader.fiat_balance = 1000.0
-            trader.btc_balance = 0.0
-            trader.total_wealth = 1000.0
+        networks = [trader.network for trader in self.population]
+        record_equity = needs_equity(self.fitness_weights)
+        walk_forward = self.windows is not None
+        multi_asset = len(self.segments) > 1
+        # The stacked timeline's own wallet is meaningless, so several assets only need actions
+        actions, fiat, btc, self.equity, notional = self.backend.simulate(
+            networks, self.features, self.prices, record_equity and not walk_forward, wallets=not multi_asset
+        )
+        if multi_asset:
+            # One pass of per-asset wallets gives the mean wealth and (without walk-forward) the fitness
+            segment_fiat, segment_equity, segment_notional = simulate_windows(
+                actions, self.prices, self.segments, record_equity and not walk_forward
+            )
+            fiat = segment_fiat.mean(axis=1)
+            btc = np.zeros_like(fiat)
+
+        for trader, fiat_balance, btc_balance in zip(self.population, fiat, btc):
+            trader.fiat_balance = float(fiat_balance)
+            trader.btc_balance = float(btc_balance)
+            trader.total_wealth = trader.fiat_balance
             trader.trade_history = []
 
-        # Daily trading simulation
-        for _, row in self.dataset.iterrows():
-            price = row['Price_Float']
-            date = row['Date']
-            features = {
-                'sin_month': row['sin_month'],
-                'cos_month': row['cos_month'],
-                'sin_doy': row['sin_doy'],
-                'cos_doy': row['cos_doy'],
-                'sin_dow': row['sin_dow'],
-                'cos_dow': row['cos_dow'],
-                'year_scaled': row['Year_Scaled'],
-                'fear_greed': row['FearGreed_Scaled']
-            }
-
-            for trader in self.population:
-                action = trader.decide(features)
-                trader.execute_trade(action, price, date)
-
-        # Finalize by selling all BTC
-        final_price = self.dataset.iloc[-1]['Price_Float']
-        final_date = self.dataset.iloc[-1]['Date']
-        for trader in self.population:
-            trader.sell_all(final_price, final_date)
-
-    def test_single_trader(self, trader):
-        """Test a single trader on the full dataset"""
-        trader.fiat_balance = 1000.0
+        if walk_forward:
+            # Network outputs above are shared by every window and asset
+            self.fitness, self.metrics = walk_forward_fitness(
+                actions, self.prices, self.windows, self.fitness_weights,
+                getattr(self.config, 'walk_forward_aggregate', 'mean'), record_equity
+            )
+        elif multi_asset:
+            self.fitness, self.metrics = window_fitness(
+                segment_fiat, segment_equity, segment_notional, self.segments, self.fitness_weights,
+                getattr(self.config, 'walk_forward_aggregate', 'mean')
+            )
+        else:
+            if record_equity:
+                self.metrics = compute_risk_metrics(fiat, notional, self.equity)
+            else:
+                self.metrics = {'wealth': fiat}
+            self.fitness = fitness_scores(self.metrics, self.fitness_weights)
+
+        # Only the best trader's history is drawn, so only it is replayed
+        best_index = int(np.argmax(fiat))
+        best = self.population[best_index]
+        wallet = (best.fiat_balance, best.btc_balance, best.total_wealth)
+        self.replay_trades(best, actions[best_index])
+        best.fiat_balance, best.btc_balance, best.total_wealth = wallet  # Keep the evaluated wealth
+
+    def replay_trades(self, trader, actions):
+        """
+        Rebuild a trader's wallet and trade history from precomputed actions
+        (on the first asset when several are stacked)
+        """
+        trader.fiat_balance = INITIAL_FIAT
         trader.btc_balance = 0.0
-        trader.total_wealth = 1000.0
+        trader.total_wealth = INITIAL_FIAT
         trader.trade_history = []
 
-        for _, row in self.dataset.iterrows():
-            price = row['Price_Float']
-            date = row['Date']
-            features = {
-                'sin_month': row['sin_month'],
-                'cos_month': row['cos_month'],
-                'sin_doy': row['sin_doy'],
-                'cos_doy': row['cos_doy'],
-                'sin_dow': row['sin_dow'],
-                'cos_dow': row['cos_dow'],
-                'year_scaled': row['Year_Scaled'],
-                'fear_greed': row['FearGreed_Scaled']
-            }
-
-            action = trader.decide(features)
+        start, end = self.segments[0]
+        dates = self.dataset['Date'].iloc[start:end]
+        prices = self.prices[start:end]
+        for action, price, date in zip(actions[start:end], prices, dates):
             trader.execute_trade(action, price, date)
+        trader.sell_all(prices[-1], dates.iloc[-1])
 
-        final_price = self.dataset.iloc[-1]['Price_Float']
-        final_date = self.dataset.iloc[-1]['Date']
-        trader.sell_all(final_price, final_date)
+    def test_single_trader(self, trader):
+        """Test a single trader on the full dataset"""
+        actions = self.backend.simulate([trader.network], self.features, self.prices)[0]
+        self.replay_trades(trader, actions[0])
         ## Visualize the trading actions
         dates = [datetime.strptime(item['date'], "%Y-%m-%d") for item in trader.trade_history]
         prices = [item['price'] for item in trader.trade_history]
@@ -211,7 +256,11 @@ class TradingEnvironment:
     def evaluate_and_evolve(self):
         """Perform genetic algorithm operations"""
         # Sort by performance
-        self.population.sort(key=lambda x: x.total_wealth, reverse=True)
+        if self.fitness is not None:
+            order = np.argsort(-self.fitness, kind='stable')
+            self.population = [self.population[i] for i in order]
+        else:
+            self.population.sort(key=lambda x: x.total_wealth, reverse=True)
         
         # Select survivors
         num_survivors = int(len(self.population) * self.config.survival_rate)
@@ -225,6 +274,7 @@ class TradingEnvironment:
             new_population.append(child)
 
         self.population = new_population
+        self.fitness = None  # Scores belong to the previous population
         self.current_generation += 1
 
     def clone_and_mutate(self, parent):
@@ -255,6 +305,13 @@ class TradingEnvironment:
             pickle.dump(data, f)
         print(f"Saved generation {self.current_generation} to {gen_path}")
 
+        if getattr(self.config, 'keep_generations', False):
+            archive_path = os.path.join(
+                self.config.save_dir, GENERATION_ARCHIVE_FILE.format(self.current_generation)
+            )
+            with open(archive_path, 'wb') as f:
+                pickle.dump(data, f)
+
     def run(self):
         """Main simulation loop"""
         if not self.load_dataset():
@@ -277,6 +334,11 @@ class TradingEnvironment:
                     print(f"Best: ${max(wealths):.2f}")
                     print(f"Average: ${np.mean(wealths):.2f}")
                     print(f"Worst: ${min(wealths):.2f}")
+                    if needs_equity(self.fitness_weights):
+                        fittest = int(np.argmax(self.fitness))
+                        print("Fittest: " + ", ".join(
+                            f"{name} {values[fittest]:.3f}" for name, values in self.metrics.items()
+                        ))
 
                     # update animation
                     best_trader = max(self.population, key=lambda x: x.total_wealth)
@@ -0,0 +1,57 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from trader import Trader
+from evaluation_backend import NumpyBackend, NumbaBackend, NUMBA_AVAILABLE
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "data", "Bitcoin_normalized.csv")
+COLUMNS = {
+    'sin_month': 'sin_month', 'cos_month': 'cos_month',
+    'sin_doy': 'sin_doy', 'cos_doy': 'cos_doy',
+    'sin_dow': 'sin_dow', 'cos_dow': 'cos_dow',
+    'year_scaled': 'Year_Scaled', 'fear_greed': 'FearGreed_Scaled'
+}  # Trader.decide feature name -> dataset column, in network input order
+
+
+@pytest.fixture(scope="module")
+def market():
+    dataset = pd.read_csv(DATASET, parse_dates=['Date']).iloc[:120].reset_index(drop=True)
+    np.random.seed(0)
+    traders = [Trader() for _ in range(8)]
+    for trader in traders:
+        # Wider weights so the networks actually trade on this slice
+        for layer in trader.network.layers:
+            layer.weights *= 8.0
+    return dataset, traders
+
+
+def run_reference_loop(dataset, trader):
+    """The original per-row decide/execute_trade simulation"""
+    for _, row in dataset.iterrows():
+        features = {name: row[column] for name, column in COLUMNS.items()}
+        trader.execute_trade(trader.decide(features), row['Price_Float'], row['Date'])
+    trader.sell_all(dataset.iloc[-1]['Price_Float'], dataset.iloc[-1]['Date'])
+    actions = [item['action'] for item in trader.trade_history[:-1]]
+    return np.array(actions), trader.total_wealth
+
+
+@pytest.mark.parametrize("backend_class", [
+    NumpyBackend,
+    pytest.param(NumbaBackend, marks=pytest.mark.skipif(not NUMBA_AVAILABLE, reason="numba not installed")),
+])
+def test_backend_matches_reference_loop(market, backend_class):
+    dataset, traders = market
+    features = dataset[list(COLUMNS.values())].to_numpy(dtype=np.float32)
+    prices = dataset['Price_Float'].to_numpy(dtype=np.float64)
+
+    actions, fiat, btc = backend_class().simulate([t.network for t in traders], features, prices)[:3]
+
+    for i, trader in enumerate(traders):
+        clone = Trader.deserialize(trader.serialize())
+        expected_actions, expected_wealth = run_reference_loop(dataset, clone)
+        np.testing.assert_allclose(actions[i], expected_actions, rtol=1e-9, atol=1e-12)
+        assert fiat[i] == pytest.approx(expected_wealth, rel=1e-9)
+        assert btc[i] == 0.0
+    assert np.any(fiat != 1000.0)  # The slice exercises real trades
@@ -0,0 +1,22 @@
+import os
+import numpy as np
+import pandas as pd
+from feature_store import FEATURE_CACHE_DIR, INDICATOR_PARAMS, _cache_key, compute_indicators, load_indicators
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "data", "Bitcoin_normalized.csv")
+
+
+def test_corrupt_cache_is_recomputed(tmp_path):
+    dataset_path = str(tmp_path / "asset.csv")
+    pd.read_csv(DATASET).iloc[:100].to_csv(dataset_path, index=False)
+    prices = pd.read_csv(dataset_path)['Price_Float'].to_numpy(dtype=np.float64)
+    cache_path = tmp_path / FEATURE_CACHE_DIR / f"{_cache_key(dataset_path, INDICATOR_PARAMS)}.npy"
+    cache_path.parent.mkdir()
+    cache_path.write_bytes(b"\x93NUMPY")  # Truncated after the magic string
+
+    indicators = load_indicators(dataset_path, prices)
+
+    np.testing.assert_array_equal(indicators, compute_indicators(prices))
+    np.testing.assert_array_equal(np.load(cache_path), indicators)
+    assert os.listdir(cache_path.parent) == [cache_path.name]  # No temporary file left behind
@@ -0,0 +1,87 @@
+import os
+import types
+import numpy as np
+import pandas as pd
+import pytest
+from trader import FEATURE_ORDER
+from feature_store import load_stacked_datasets, feature_matrix
+from evaluation_backend import NumpyBackend
+from walk_forward import simulate_windows
+from simulation_engine import TradingEnvironment
+from holdout import evaluate_holdout
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "data", "Bitcoin_normalized.csv")
+
+
+@pytest.fixture
+def asset_paths(tmp_path):
+    """Two small assets of different lengths cut from the Bitcoin dataset"""
+    data = pd.read_csv(DATASET)
+    paths = [str(tmp_path / "first.csv"), str(tmp_path / "second.csv")]
+    data.iloc[:150].to_csv(paths[0], index=False)
+    data.iloc[400:520].to_csv(paths[1], index=False)
+    return paths
+
+
+@pytest.fixture
+def environment(tmp_path, asset_paths):
+    config = types.SimpleNamespace(
+        save_dir=str(tmp_path / "simulation"), dataset_path=asset_paths[0], dataset_paths=asset_paths,
+        start_date=None, end_date=None, population=8, backend='numpy'
+    )
+    np.random.seed(0)
+    env = TradingEnvironment(config, test_mode=True)
+    for trader in env.population:
+        # Wider weights so the networks actually trade on these slices
+        for layer in trader.network.layers:
+            layer.weights *= 8.0
+    assert env.load_dataset()
+    return env
+
+
+def separate_fiat(networks, path):
+    """Final wealth of a plain single-asset simulation"""
+    dataset, _ = load_stacked_datasets([path])
+    features = feature_matrix(dataset, FEATURE_ORDER)
+    return NumpyBackend().simulate(networks, features, dataset['Price_Float'].to_numpy(dtype=np.float64))[1]
+
+
+def test_stacked_segments(asset_paths):
+    dataset, segments = load_stacked_datasets(asset_paths)
+    np.testing.assert_array_equal(segments, [[0, 150], [150, 270]])
+    assert list(dataset['Asset'].iloc[segments[:, 0]]) == ['first', 'second']
+
+
+def test_duplicate_file_names_rejected(tmp_path, asset_paths):
+    os.makedirs(tmp_path / "other")
+    duplicate = str(tmp_path / "other" / "first.csv")
+    pd.read_csv(asset_paths[0]).to_csv(duplicate, index=False)
+    with pytest.raises(ValueError):
+        load_stacked_datasets([asset_paths[0], duplicate])
+
+
+def test_segment_wealth_matches_single_asset_runs(environment, asset_paths):
+    networks = [trader.network for trader in environment.population]
+    actions = NumpyBackend().simulate(networks, environment.features, environment.prices, wallets=False)[0]
+    segment_fiat = simulate_windows(actions, environment.prices, environment.segments)[0]
+
+    expected = np.stack([separate_fiat(networks, path) for path in asset_paths], axis=1)
+    np.testing.assert_allclose(segment_fiat, expected, rtol=1e-12)
+    assert np.any(expected != 1000.0)  # The slices exercise real trades
+
+    environment.run_generation()
+    wealth = np.array([trader.total_wealth for trader in environment.population])
+    np.testing.assert_allclose(wealth, expected.mean(axis=1), rtol=1e-12)
+
+
+def test_holdout_ranks_within_each_asset(environment, asset_paths):
+    entries = [(0, i, trader) for i, trader in enumerate(environment.population)]
+    leaderboard = evaluate_holdout(entries, environment.dataset, environment.segments, NumpyBackend())
+
+    networks = [trader.network for trader in environment.population]
+    for asset, path in zip(['first', 'second'], asset_paths):
+        board = leaderboard[leaderboard['asset'] == asset]
+        assert list(board['rank']) == list(range(1, len(entries) + 1))
+        assert np.all(np.diff(board['wealth'].to_numpy()) <= 0)
+        np.testing.assert_allclose(board.sort_values('trader')['wealth'], separate_fiat(networks, path), rtol=1e-12)
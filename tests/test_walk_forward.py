@@ -0,0 +1,51 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from trader import Trader, FEATURE_ORDER
+from feature_store import feature_matrix
+from evaluation_backend import NumpyBackend
+from walk_forward import make_windows, simulate_windows
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "data", "Bitcoin_normalized.csv")
+
+
+@pytest.fixture(scope="module")
+def market():
+    dataset = pd.read_csv(DATASET).iloc[:200].reset_index(drop=True)
+    np.random.seed(1)
+    traders = [Trader() for _ in range(6)]
+    for trader in traders:
+        # Wider weights so the networks actually trade on this slice
+        for layer in trader.network.layers:
+            layer.weights *= 8.0
+    features = feature_matrix(dataset, FEATURE_ORDER)
+    prices = dataset['Price_Float'].to_numpy(dtype=np.float64)
+    return [t.network for t in traders], features, prices
+
+
+def test_overlapping_windows_match_separate_runs(market):
+    networks, features, prices = market
+    backend = NumpyBackend()
+    windows = make_windows(len(prices), 60, 25)  # Overlapping: step < window
+    actions = backend.simulate(networks, features, prices)[0]
+
+    fiat, equity, notional = simulate_windows(actions, prices, windows, record_equity=True)
+
+    assert fiat.shape == (len(networks), len(windows))
+    for k, (start, end) in enumerate(windows):
+        _, expected_fiat, _, expected_equity, expected_notional = backend.simulate(
+            networks, features[start:end], prices[start:end], record_equity=True
+        )
+        np.testing.assert_allclose(fiat[:, k], expected_fiat, rtol=1e-12)
+        np.testing.assert_allclose(equity[:, k, :end - start], expected_equity, rtol=1e-6)
+        np.testing.assert_allclose(notional[:, k, :end - start], expected_notional, rtol=1e-6, atol=1e-6)
+    assert np.any(fiat != 1000.0)  # The windows exercise real trades
+
+
+def test_windows_must_be_sorted(market):
+    networks, features, prices = market
+    actions = np.zeros((len(networks), len(prices)))
+    with pytest.raises(ValueError):
+        simulate_windows(actions, prices, np.array([[50, 100], [0, 60]]))
@@ -1,41 +1,43 @@
 import numpy as np
 from neural_network import NeuralNetwork  
 
+# Network input order for market feature dicts
+FEATURE_ORDER = [
+    'sin_month', 'cos_month',
+    'sin_doy', 'cos_doy',
+    'sin_dow', 'cos_dow',
+    'year_scaled', 'fear_greed'
+]
+
 class Trader:
-    def __init__(self, network=None, initial_fiat=1000.0, initial_btc=0.0):
+    def __init__(self, network=None, initial_fiat=1000.0, initial_btc=0.0, input_size=len(FEATURE_ORDER)):
         """
         Initialize a trader with:
         - Neural network decision maker
         - Wallet balances
         - Trading history
         """
-        self.network = network if network else self._create_random_network()
+        self.network = network if network else self._create_random_network(input_size)
         self.fiat_balance = initial_fiat
         self.btc_balance = initial_btc
         self.total_wealth = initial_fiat
         self.trade_history = []
 
-    def _create_random_network(self):
+    def _create_random_network(self, input_size=len(FEATURE_ORDER)):
         """Generate neural network with random architecture"""
         hidden_layers = np.random.choice([10, 20, 30], p=[0.2, 0.5, 0.3])
-        layer_sizes = [8]  # Input layer
+        layer_sizes = [input_size]  # Input layer
         for _ in range(hidden_layers):
             layer_sizes.append(np.random.choice([4, 8, 16]))
         layer_sizes.append(1)  # Output layer
         return NeuralNetwork(layer_sizes)
 
-    def decide(self, market_features):
+    def decide(self, market_features, feature_order=FEATURE_ORDER):
         """
         Process market data through neural network
         Returns: Action value between [-1, 1]
         """
         # Convert features to numpy array in correct order
-        feature_order = [
-            'sin_month', 'cos_month',
-            'sin_doy', 'cos_doy',
-            'sin_dow', 'cos_dow',
-            'year_scaled', 'fear_greed'
-        ]
         inputs = np.array([market_features[k] for k in feature_order], dtype=np.float32)
         return self.network.predict(inputs)
 
@@ -3,18 +3,31 @@ import pickle
 from datetime import datetime
 import argparse
 import sys
+from evaluation_backend import BACKEND_CHOICES
+from metrics import METRIC_NAMES, DEFAULT_FITNESS
+from walk_forward import AGGREGATE_CHOICES
+from feature_store import FEATURE_NAMES, validate_feature_names
+from trader import FEATURE_ORDER
 
 CONFIG_FILE = "simulation_config.pkl"
 
 class SimulationConfig:
     def __init__(self, args):
-        self.dataset_path = args.dataset
+        self.dataset_path = args.dataset[0]
+        self.dataset_paths = args.dataset
         self.start_date = args.start_date
         self.end_date = args.end_date
         self.save_dir = args.save_dir
         self.gen_save_interval = args.gen_save_interval
         self.population = args.population
         self.survival_rate = args.survival_rate
+        self.backend = args.backend
+        self.keep_generations = args.keep_generations
+        self.fitness = args.fitness
+        self.features = args.features
+        self.walk_forward_window = args.wf_window
+        self.walk_forward_step = args.wf_step
+        self.walk_forward_aggregate = args.wf_aggregate
 
 class Utilities:
     @staticmethod
@@ -41,6 +54,44 @@ class Utilities:
         if not 0 < rate < 1:
             raise ValueError("Survival rate must be between 0 and 1")
 
+    @staticmethod
+    def positive_int(value):
+        """argparse type for counts that must be at least 1"""
+        try:
+            number = int(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid integer: {value}")
+        if number < 1:
+            raise argparse.ArgumentTypeError(f"Must be at least 1: {value}")
+        return number
+
+    @staticmethod
+    def parse_fitness(spec):
+        """
+        Parse a fitness combination like 'sharpe=1,max_drawdown=-0.5'
+        into a dict of metric name -> weight (a bare name means weight 1)
+        """
+        fitness = {}
+        for part in spec.split(','):
+            name, _, weight = part.strip().partition('=')
+            if name not in METRIC_NAMES:
+                raise argparse.ArgumentTypeError(
+                    f"Unknown fitness metric '{name}' (choose from {', '.join(METRIC_NAMES)})"
+                )
+            try:
+                fitness[name] = float(weight) if weight else 1.0
+            except ValueError:
+                raise argparse.ArgumentTypeError(f"Invalid weight for '{name}': {weight}")
+        return fitness
+
+    @staticmethod
+    def parse_features(spec):
+        """Parse a comma separated list of network input features"""
+        try:
+            return validate_feature_names([name.strip() for name in spec.split(',')])
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+
     @staticmethod
     def setup_arg_parse():
         parser = argparse.ArgumentParser(description="Bitcoin Trading Evolution Simulator")
@@ -48,7 +99,8 @@ class Utilities:
 
         # New simulation parser
         new_parser = subparsers.add_parser('new', aliases=['-n'], help='Start new simulation')
-        new_parser.add_argument('-d', '--dataset', required=True, help='Path to dataset CSV')
+        new_parser.add_argument('-d', '--dataset', required=True, nargs='+',
+                              help='Path to dataset CSV; several normalized datasets are evaluated together')
         new_parser.add_argument('-s', '--start-date', required=True, help='Start date (YYYY-MM-DD)')
         new_parser.add_argument('-e', '--end-date', required=True, help='End date (YYYY-MM-DD)')
         new_parser.add_argument('-sd', '--save-dir', required=True, help='Directory to save simulation data')
@@ -56,11 +108,65 @@ class Utilities:
         new_parser.add_argument('-sr', '--survival-rate', type=float, default=0.2, help='Top percentage to survive')
         new_parser.add_argument('-si', '--save-interval', type=int, default=10, dest='gen_save_interval',
                               help='Save every N generations')
+        new_parser.add_argument('-b', '--backend', choices=BACKEND_CHOICES, default='auto',
+                              help='Evaluation backend (auto uses numba when installed)')
+        new_parser.add_argument('-kg', '--keep-generations', action='store_true',
+                              help='Also keep a snapshot of every saved generation')
+        new_parser.add_argument('-f', '--fitness', type=Utilities.parse_fitness, default=DEFAULT_FITNESS,
+                              help="Weighted metrics to select on, e.g. 'sharpe=1,max_drawdown=-0.5' "
+                                   f"(metrics: {', '.join(METRIC_NAMES)}; default: wealth)")
+        new_parser.add_argument('-F', '--features', type=Utilities.parse_features, default=list(FEATURE_ORDER),
+                              help='Comma separated network inputs; the input layer width follows '
+                                   f"(available: {', '.join(FEATURE_NAMES)}; default: the 8 calendar/fear-greed features)")
+        new_parser.add_argument('-ww', '--wf-window', type=int, default=None,
+                              help='Walk-forward window length in trading days (default: off)')
+        new_parser.add_argument('-ws', '--wf-step', type=int, default=None,
+                              help='Days between walk-forward window starts (default: window length)')
+        new_parser.add_argument('-wa', '--wf-aggregate', '--aggregate', choices=AGGREGATE_CHOICES, default='mean',
+                              dest='wf_aggregate', help='How window and asset fitness is combined (default: mean)')
 
         # Load simulation parser
         load_parser = subparsers.add_parser('load', aliases=['-l'], help='Load existing simulation')
         load_parser.add_argument('save_dir', help='Directory containing simulation data')
         load_parser.add_argument('--test-phase', default=False, help='Enable test-phase mode (default: False)')
+        load_parser.add_argument('-b', '--backend', choices=BACKEND_CHOICES, default=None,
+                              help='Override the saved evaluation backend')
+        load_parser.add_argument('-f', '--fitness', type=Utilities.parse_fitness, default=None,
+                              help='Override the saved fitness combination')
+
+        # Holdout evaluation parser
+        holdout_parser = subparsers.add_parser('holdout', help='Rank saved traders on a holdout date range')
+        holdout_parser.add_argument('save_dir', help='Directory containing simulation data')
+        holdout_parser.add_argument('-s', '--start-date', default=None, help='Start date (YYYY-MM-DD), default: dataset start')
+        holdout_parser.add_argument('-e', '--end-date', default=None, help='End date (YYYY-MM-DD), default: dataset end')
+        holdout_parser.add_argument('-d', '--dataset', nargs='+', default=None,
+                                  help='Dataset CSV(s) (default: simulation datasets)')
+        holdout_parser.add_argument('-fg', '--first-gen', type=int, default=None,
+                                  help='First archived generation to evaluate (default: latest checkpoint only)')
+        holdout_parser.add_argument('-lg', '--last-gen', type=int, default=None,
+                                  help='Last archived generation to evaluate')
+        holdout_parser.add_argument('-o', '--output', default=None, help='Leaderboard CSV path')
+        holdout_parser.add_argument('-b', '--backend', choices=BACKEND_CHOICES, default=None,
+                                  help='Override the saved evaluation backend')
+
+        # Decision service parser
+        serve_parser = subparsers.add_parser('serve', help='Serve decisions from the best traders of a simulation')
+        serve_parser.add_argument('save_dir', help='Directory containing simulation data')
+        serve_parser.add_argument('-k', '--top-k', type=Utilities.positive_int, default=5, help='Number of best traders to serve')
+        serve_parser.add_argument('--host', default='127.0.0.1', help='Host to bind (default: 127.0.0.1)')
+        serve_parser.add_argument('--port', type=int, default=8765, help='Port to bind (default: 8765)')
+        serve_parser.add_argument('--max-batch', type=Utilities.positive_int, default=64, help='Maximum requests per batched forward pass')
+        serve_parser.add_argument('--max-delay-ms', type=float, default=2.0,
+                                help='Maximum time to wait for a batch to fill')
+
+        # Load generator parser
+        loadgen_parser = subparsers.add_parser('loadgen', help='Benchmark a running decision service')
+        loadgen_parser.add_argument('--host', default='127.0.0.1', help='Service host (default: 127.0.0.1)')
+        loadgen_parser.add_argument('--port', type=int, default=8765, help='Service port (default: 8765)')
+        loadgen_parser.add_argument('-c', '--clients', type=int, default=32, help='Concurrent client connections')
+        loadgen_parser.add_argument('-r', '--requests', type=int, default=200, help='Requests per client')
+        loadgen_parser.add_argument('-d', '--dataset', default=None, help='Dataset CSV to sample features from')
+        loadgen_parser.add_argument('--ensemble', action='store_true', help='Request ensemble averages')
 
         return parser
 
@@ -73,6 +179,10 @@ class Utilities:
             
             if args.population <= 0:
                 raise ValueError("Population size must be positive")
+            if args.wf_window is not None and args.wf_window <= 0:
+                raise ValueError("Walk-forward window must be positive")
+            if args.wf_step is not None and args.wf_step <= 0:
+                raise ValueError("Walk-forward step must be positive")
 
             config = SimulationConfig(args)
             config_path = os.path.join(args.save_dir, CONFIG_FILE)
@@ -99,10 +209,17 @@ class Utilities:
                 config = pickle.load(f)
             
             print(f"Loaded simulation from: {save_dir}")
-            print(f"Dataset: {config.dataset_path}")
+            print(f"Dataset: {', '.join(getattr(config, 'dataset_paths', [config.dataset_path]))}")
             print(f"Date Range: {config.start_date} to {config.end_date}")
             print(f"Population: {config.population} traders")
             print(f"Survival Rate: {config.survival_rate*100}%")
+            print(f"Backend: {getattr(config, 'backend', 'auto')}")
+            print(f"Fitness: {getattr(config, 'fitness', DEFAULT_FITNESS)}")
+            print(f"Features: {', '.join(getattr(config, 'features', FEATURE_ORDER))}")
+            if getattr(config, 'walk_forward_window', None):
+                print(f"Walk-Forward: {config.walk_forward_window} day windows, "
+                      f"step {config.walk_forward_step or config.walk_forward_window}, "
+                      f"{config.walk_forward_aggregate} aggregate")
             return config  # Return loaded config
 
         except Exception as e:
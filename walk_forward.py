@@ -0,0 +1,130 @@
+import numpy as np
+from evaluation_backend import INITIAL_FIAT
+from metrics import compute_risk_metrics, fitness_scores
+
+# Constants
+AGGREGATE_CHOICES = ['mean', 'worst']
+
+
+def make_windows(num_days, window, step=None):
+    """
+    Rolling train windows over num_days trading days
+    Returns: (K x 2) array of [start, end) day indices
+    """
+    step = step or window
+    if window <= 0 or step <= 0:
+        raise ValueError("Walk-forward window and step must be positive")
+    if window > num_days:
+        raise ValueError(f"Walk-forward window of {window} days exceeds the {num_days} loaded days")
+    starts = np.arange(0, num_days - window + 1, step)
+    return np.stack([starts, starts + window], axis=1)
+
+
+def simulate_windows(actions, prices, windows, record_equity=False):
+    """
+    Run every window's wallets side by side from shared network outputs
+    actions: (P x T) clipped actions over the full range
+    windows: (K x 2) [start, end) day ranges sorted by start with
+    non-decreasing ends (as built by make_windows)
+    Returns: (fiat, equity, notional) with fiat (P x K) after each window's
+    final sell-all; equity and traded notional (P x K x L) float32 where
+    column j of window k is day start_k + j (L is the longest window)
+    """
+    starts, ends = windows[:, 0], windows[:, 1]
+    if np.any(np.diff(starts) < 0) or np.any(np.diff(ends) < 0):
+        raise ValueError("Windows must be sorted by start with non-decreasing ends")
+
+    # Stored window-major (K x P, K x L x P) so each day's active windows are
+    # contiguous rows; returned as (P x K) and (P x K x L) views
+    fiat = np.full((len(windows), actions.shape[0]), INITIAL_FIAT)
+    btc = np.zeros_like(fiat)
+    span = int(np.max(ends - starts))
+    equity = np.empty((len(windows), span, actions.shape[0]), dtype=np.float32) if record_equity else None
+    notional = np.empty_like(equity) if record_equity else None
+
+    for t in range(starts.min(), ends.max()):
+        # Only windows covering day t are touched: [lo, hi) is contiguous
+        lo = np.searchsorted(ends, t, side='right')
+        hi = np.searchsorted(starts, t, side='right')
+        if lo >= hi:
+            continue
+        window_fiat = fiat[lo:hi]
+        window_btc = btc[lo:hi]
+        action = actions[:, t]
+        price = prices[t]
+
+        btc_to_buy = np.where(action > 0, (window_fiat / price) * action, 0.0)
+        window_fiat -= btc_to_buy * price
+        window_btc += btc_to_buy
+        btc_to_sell = np.where(action < 0, window_btc * -action, 0.0)
+        window_fiat += btc_to_sell * price
+        window_btc -= btc_to_sell
+        if record_equity:
+            active = np.arange(lo, hi)
+            equity[active, t - starts[lo:hi]] = window_fiat + window_btc * price
+            notional[active, t - starts[lo:hi]] = (btc_to_buy + btc_to_sell) * price
+
+        # Sell all BTC on the last day of each closing window (the first ones in [lo, hi))
+        closing = np.searchsorted(ends, t + 1, side='right')
+        if closing > lo:
+            fiat[lo:closing] += btc[lo:closing] * price
+            btc[lo:closing] -= btc[lo:closing]
+
+    if record_equity:
+        equity, notional = equity.transpose(2, 0, 1), notional.transpose(2, 0, 1)
+    return fiat.T, equity, notional
+
+
+def window_metrics(fiat, equity, notional, windows):
+    """
+    Metrics of every trader on every window from simulate_windows results
+    Returns: dict of metric name -> (P x K) array (only wealth without equity)
+    """
+    if equity is None:
+        return {'wealth': fiat}
+
+    metrics = {}
+    for k, (start, end) in enumerate(windows):
+        window = compute_risk_metrics(fiat[:, k], notional[:, k, :end - start], equity[:, k, :end - start])
+        for name, values in window.items():
+            metrics.setdefault(name, np.empty(fiat.shape))[:, k] = values
+    return metrics
+
+
+def aggregate_metrics(metrics, fitness, aggregate='mean'):
+    """
+    Collapse per-window metrics (P x K) to one value per trader before scoring
+    'worst' takes each trader's least favourable window per metric: the minimum
+    of rewarded metrics and the maximum of penalized ones (others are averaged)
+    """
+    if aggregate == 'mean':
+        return {name: values.mean(axis=1) for name, values in metrics.items()}
+    aggregated = {}
+    for name, values in metrics.items():
+        weight = fitness.get(name, 0.0)
+        if weight > 0:
+            aggregated[name] = values.min(axis=1)
+        elif weight < 0:
+            aggregated[name] = values.max(axis=1)
+        else:
+            aggregated[name] = values.mean(axis=1)
+    return aggregated
+
+
+def window_fitness(fiat, equity, notional, windows, fitness, aggregate='mean'):
+    """
+    Fitness from simulate_windows results: raw metrics are aggregated over the
+    windows first and z-scored across the population once
+    Returns: (scores, metrics) with scores (P,) and the aggregated metrics
+    """
+    metrics = aggregate_metrics(window_metrics(fiat, equity, notional, windows), fitness, aggregate)
+    return fitness_scores(metrics, fitness), metrics
+
+
+def walk_forward_fitness(actions, prices, windows, fitness, aggregate='mean', record_equity=False):
+    """
+    Simulate every window from shared actions and score the traders across them
+    Returns: (scores, metrics) as window_fitness
+    """
+    fiat, equity, notional = simulate_windows(actions, prices, windows, record_equity)
+    return window_fitness(fiat, equity, notional, windows, fitness, aggregate)